@@ -1,13 +1,33 @@
-use crate::patterns::{analyze_session_quality, get_patterns, SessionQuality};
+use crate::patterns::{get_patterns, SessionQuality};
 use crate::session::{AnalysisMetrics, Methodology, MethodologyStats, SessionMetadata, SessionsMetadata};
 use anyhow::{Context, Result};
+use flate2::read::GzDecoder;
 use std::collections::HashMap;
+use std::fmt::Write;
 use std::fs;
+use std::io::{self, Read};
 use std::path::{Path, PathBuf};
+use std::sync::Mutex;
+use std::time::SystemTime;
 
 pub struct SessionAnalyzer {
     logs_dir: PathBuf,
     metadata: SessionsMetadata,
+    // Metrics memoized per log file, keyed by (mtime, size) so a rewritten
+    // log is re-scanned while repeat analysis of an unchanged log is free.
+    metrics_cache: Mutex<HashMap<PathBuf, CachedMetrics>>,
+}
+
+struct CachedMetrics {
+    modified: SystemTime,
+    size: u64,
+    metrics: AnalysisMetrics,
+}
+
+fn is_not_found(error: &anyhow::Error) -> bool {
+    error.chain()
+        .filter_map(|cause| cause.downcast_ref::<io::Error>())
+        .any(|io_error| io_error.kind() == io::ErrorKind::NotFound)
 }
 
 impl SessionAnalyzer {
@@ -17,12 +37,12 @@ impl SessionAnalyzer {
     }
 
     pub fn new_with_dir(logs_dir: &Path) -> Result<Self> {
-        let metadata_file = logs_dir.join("sessions_metadata.json");
-        let metadata = Self::load_metadata(&metadata_file)?;
+        let metadata = SessionsMetadata::load_from_dir(logs_dir)?;
 
         Ok(Self {
             logs_dir: logs_dir.to_path_buf(),
             metadata,
+            metrics_cache: Mutex::new(HashMap::new()),
         })
     }
 
@@ -32,140 +52,245 @@ impl SessionAnalyzer {
         Ok(home_dir.join(".claude-logs"))
     }
 
-    fn load_metadata(metadata_file: &Path) -> Result<SessionsMetadata> {
-        if metadata_file.exists() {
-            let content = fs::read_to_string(metadata_file)
-                .with_context(|| format!("Failed to read metadata file: {}", metadata_file.display()))?;
-            
-            serde_json::from_str(&content)
-                .with_context(|| format!("Failed to parse metadata file: {}", metadata_file.display()))
+    pub fn analyze_log_file(&self, log_path: &Path) -> Result<AnalysisMetrics> {
+        let stat = fs::metadata(log_path)
+            .with_context(|| format!("Failed to read log file: {}", log_path.display()))?;
+        let modified = stat.modified()
+            .with_context(|| format!("Failed to read log file: {}", log_path.display()))?;
+        let size = stat.len();
+
+        // Logs are append-only once a session ends, so an unchanged
+        // (mtime, size) pair means the cached metrics are still valid.
+        if let Some(cached) = self.metrics_cache.lock().unwrap().get(log_path) {
+            if cached.modified == modified && cached.size == size {
+                return Ok(cached.metrics.clone());
+            }
+        }
+
+        // Stream the log line by line rather than slurping it whole; session
+        // transcripts can be large and the pattern scan only needs one pass.
+        let reader = Self::open_log(log_path)
+            .with_context(|| format!("Failed to read log file: {}", log_path.display()))?;
+
+        let patterns = get_patterns();
+        let metrics = patterns.analyze_reader(reader)
+            .with_context(|| format!("Failed to read log file: {}", log_path.display()))?;
+
+        self.metrics_cache.lock().unwrap().insert(
+            log_path.to_path_buf(),
+            CachedMetrics { modified, size, metrics: metrics.clone() },
+        );
+
+        Ok(metrics)
+    }
+
+    /// Open a session log for reading, decompressing transparently if it was
+    /// stored gzipped.
+    fn open_log(log_path: &Path) -> io::Result<Box<dyn io::BufRead>> {
+        let file = fs::File::open(log_path)?;
+
+        if log_path.extension().and_then(|ext| ext.to_str()) == Some("gz") {
+            Ok(Box::new(io::BufReader::new(GzDecoder::new(file))))
         } else {
-            Ok(SessionsMetadata::new())
+            Ok(Box::new(io::BufReader::new(file)))
         }
     }
 
-    pub fn analyze_log_file(&self, log_path: &Path) -> Result<AnalysisMetrics> {
-        let content = fs::read_to_string(log_path)
+    /// Read a full log into a string, decompressing if necessary. Used by the
+    /// show command's --full output.
+    pub fn read_log_contents(log_path: &Path) -> Result<String> {
+        let mut reader = Self::open_log(log_path)
             .with_context(|| format!("Failed to read log file: {}", log_path.display()))?;
 
-        let patterns = get_patterns();
-        Ok(patterns.analyze_content(&content))
+        let mut contents = String::new();
+        reader.read_to_string(&mut contents)
+            .with_context(|| format!("Failed to read log file: {}", log_path.display()))?;
+
+        Ok(contents)
     }
 
     pub fn analyze_session(&self, session_id: &str) -> Result<(AnalysisMetrics, SessionQuality)> {
         let session = self.metadata.get_session(session_id)
             .context("Session not found")?;
 
+        // Quality scores are a pure function of the metrics, so one pass over
+        // the log (already cached by analyze_log_file) serves both results.
         let metrics = self.analyze_log_file(&session.log_file)?;
-        let quality = analyze_session_quality(&fs::read_to_string(&session.log_file)?);
+        let quality = SessionQuality::from_metrics(&metrics);
 
         Ok((metrics, quality))
     }
 
     pub fn compare_methodologies(&self) -> Result<HashMap<Methodology, MethodologyStats>> {
-        let mut methodology_stats = HashMap::new();
-
-        for (methodology, sessions) in self.metadata.sessions_by_methodology() {
-            let mut stats = MethodologyStats::new();
-
-            for session in sessions {
-                if session.log_file.exists() {
-                    match self.analyze_log_file(&session.log_file) {
-                        Ok(metrics) => stats.add_session(session, metrics),
-                        Err(e) => {
-                            eprintln!("Warning: Failed to analyze session {}: {}", session.id, e);
-                        }
-                    }
-                } else {
+        let by_methodology = self.metadata.sessions_by_methodology();
+
+        let mut methodology_stats: HashMap<Methodology, MethodologyStats> = by_methodology
+            .keys()
+            .map(|methodology| (methodology.clone(), MethodologyStats::new()))
+            .collect();
+
+        // Each log scan is independent, so flatten the sessions into one work
+        // list and fan it out across the available cores with scoped threads.
+        // Aggregation stays single-threaded to keep MethodologyStats simple.
+        let work: Vec<(Methodology, &SessionMetadata)> = by_methodology
+            .iter()
+            .flat_map(|(methodology, sessions)| {
+                sessions.iter().map(|session| (methodology.clone(), *session))
+            })
+            .collect();
+
+        let threads = std::thread::available_parallelism()
+            .map(|n| n.get())
+            .unwrap_or(1)
+            .min(work.len().max(1));
+
+        let results: Vec<(Methodology, &SessionMetadata, Result<AnalysisMetrics>)> =
+            if threads <= 1 {
+                work.iter()
+                    .map(|(methodology, session)| {
+                        (methodology.clone(), *session, self.analyze_log_file(&session.log_file))
+                    })
+                    .collect()
+            } else {
+                let chunk_size = work.len().div_ceil(threads);
+                std::thread::scope(|scope| {
+                    let handles: Vec<_> = work
+                        .chunks(chunk_size)
+                        .map(|chunk| {
+                            scope.spawn(move || {
+                                chunk
+                                    .iter()
+                                    .map(|(methodology, session)| {
+                                        (
+                                            methodology.clone(),
+                                            *session,
+                                            self.analyze_log_file(&session.log_file),
+                                        )
+                                    })
+                                    .collect::<Vec<_>>()
+                            })
+                        })
+                        .collect();
+
+                    handles
+                        .into_iter()
+                        .flat_map(|handle| handle.join().expect("log analysis thread panicked"))
+                        .collect()
+                })
+            };
+
+        for (methodology, session, result) in results {
+            let stats = methodology_stats
+                .get_mut(&methodology)
+                .expect("stats pre-populated per methodology");
+
+            // analyze_log_file stats the file anyway, so let it report a
+            // missing log rather than paying an extra exists() per session.
+            match result {
+                Ok(metrics) => stats.add_session(session, metrics),
+                Err(e) if is_not_found(&e) => {
                     eprintln!("Warning: Log file not found for session {}", session.id);
                 }
+                Err(e) => {
+                    eprintln!("Warning: Failed to analyze session {}: {}", session.id, e);
+                }
             }
-
-            methodology_stats.insert(methodology, stats);
         }
 
         Ok(methodology_stats)
     }
 
     pub fn generate_report(&self) -> Result<()> {
-        println!("=== Claude Code Session Analysis Report ===\n");
+        print!("{}", self.build_report()?);
+        Ok(())
+    }
+
+    /// Render the full analysis report as a string. Separated from
+    /// `generate_report` so the report text can be inspected or redirected
+    /// without capturing stdout.
+    pub fn build_report(&self) -> Result<String> {
+        // Assemble the whole report in memory and emit it with one write;
+        // dozens of small println! calls each flush to a line-buffered TTY.
+        let mut report = String::new();
+        writeln!(report, "=== Claude Code Session Analysis Report ===\n")?;
 
         let methodology_stats = self.compare_methodologies()?;
 
         if methodology_stats.is_empty() {
-            println!("No sessions found for analysis.");
-            return Ok(());
+            writeln!(report, "No sessions found for analysis.")?;
+            return Ok(report);
         }
 
         // Overall statistics
         let total_sessions: usize = methodology_stats.values().map(|stats| stats.sessions).sum();
-        println!("Total Sessions Analyzed: {}\n", total_sessions);
+        writeln!(report, "Total Sessions Analyzed: {}\n", total_sessions)?;
 
         // Methodology comparison
-        println!("=== Methodology Comparison ===");
+        writeln!(report, "=== Methodology Comparison ===")?;
         for (methodology, stats) in &methodology_stats {
             if stats.sessions == 0 {
                 continue;
             }
 
-            println!("\n{} Sessions:", methodology);
-            println!("  Sessions: {}", stats.sessions);
-            
+            writeln!(report, "\n{} Sessions:", methodology)?;
+            writeln!(report, "  Sessions: {}", stats.sessions)?;
+
             if stats.avg_duration.num_minutes() > 0 {
-                println!("  Average Duration: {} minutes", stats.avg_duration.num_minutes());
-                println!("  Total Duration: {} minutes", stats.total_duration.num_minutes());
+                writeln!(report, "  Average Duration: {} minutes", stats.avg_duration.num_minutes())?;
+                writeln!(report, "  Total Duration: {} minutes", stats.total_duration.num_minutes())?;
             }
 
             if let Some(avg_energy) = stats.avg_energy {
-                println!("  Average Creative Energy: {:.1}/3", avg_energy);
+                writeln!(report, "  Average Creative Energy: {:.1}/3", avg_energy)?;
             }
 
-            println!("  Conversation Metrics:");
-            println!("    Total Exchanges: {}", stats.metrics.exchanges);
-            println!("    Code Blocks: {}", stats.metrics.code_blocks);
-            println!("    Questions Asked: {}", stats.metrics.questions_asked);
-            println!("    Enthusiasm Markers: {}", stats.metrics.enthusiasm_markers);
-            println!("    Confusion Markers: {}", stats.metrics.confusion_markers);
-            println!("    Compaction Indicators: {}", stats.metrics.compaction_indicators);
+            writeln!(report, "  Conversation Metrics:")?;
+            writeln!(report, "    Total Exchanges: {}", stats.metrics.exchanges)?;
+            writeln!(report, "    Code Blocks: {}", stats.metrics.code_blocks)?;
+            writeln!(report, "    Questions Asked: {}", stats.metrics.questions_asked)?;
+            writeln!(report, "    Enthusiasm Markers: {}", stats.metrics.enthusiasm_markers)?;
+            writeln!(report, "    Confusion Markers: {}", stats.metrics.confusion_markers)?;
+            writeln!(report, "    Compaction Indicators: {}", stats.metrics.compaction_indicators)?;
 
             // Calculate derived metrics
             if stats.sessions > 0 {
                 let avg_exchanges = stats.metrics.exchanges as f64 / stats.sessions as f64;
                 let avg_code_blocks = stats.metrics.code_blocks as f64 / stats.sessions as f64;
-                println!("  Average per Session:");
-                println!("    Exchanges: {:.1}", avg_exchanges);
-                println!("    Code Blocks: {:.1}", avg_code_blocks);
+                writeln!(report, "  Average per Session:")?;
+                writeln!(report, "    Exchanges: {:.1}", avg_exchanges)?;
+                writeln!(report, "    Code Blocks: {:.1}", avg_code_blocks)?;
             }
         }
 
         // Quality analysis
-        println!("\n=== Session Quality Analysis ===");
-        self.generate_quality_report(&methodology_stats)?;
+        writeln!(report, "\n=== Session Quality Analysis ===")?;
+        self.generate_quality_report(&mut report, &methodology_stats)?;
 
         // Recommendations
-        println!("\n=== Recommendations ===");
-        self.generate_recommendations(&methodology_stats);
+        writeln!(report, "\n=== Recommendations ===")?;
+        self.generate_recommendations(&mut report, &methodology_stats)?;
 
-        Ok(())
+        Ok(report)
     }
 
-    fn generate_quality_report(&self, methodology_stats: &HashMap<Methodology, MethodologyStats>) -> Result<()> {
+    fn generate_quality_report(&self, report: &mut String, methodology_stats: &HashMap<Methodology, MethodologyStats>) -> Result<()> {
         for (methodology, stats) in methodology_stats {
             if stats.sessions == 0 {
                 continue;
             }
 
-            println!("\n{} Quality Metrics:", methodology);
-            
+            writeln!(report, "\n{} Quality Metrics:", methodology)?;
+
             // Sample a few sessions for detailed quality analysis
             let sessions_by_methodology = self.metadata.sessions_by_methodology();
             if let Some(sessions) = sessions_by_methodology.get(methodology) {
                 let mut quality_scores = Vec::new();
 
                 for session in sessions.iter().take(5) { // Sample first 5 sessions
-                    if let Ok(content) = fs::read_to_string(&session.log_file) {
-                        let quality = analyze_session_quality(&content);
-                        quality_scores.push(quality);
+                    // The metrics cache already holds these from the
+                    // comparison pass, so no log is re-opened here.
+                    if let Ok(metrics) = self.analyze_log_file(&session.log_file) {
+                        quality_scores.push(SessionQuality::from_metrics(&metrics));
                     }
                 }
 
@@ -175,10 +300,10 @@ impl SessionAnalyzer {
                     let avg_productivity = quality_scores.iter().map(|q| q.productivity_score).sum::<f64>() / quality_scores.len() as f64;
                     let avg_overall = quality_scores.iter().map(|q| q.overall_score).sum::<f64>() / quality_scores.len() as f64;
 
-                    println!("  Average Engagement Score: {:.1}/100", avg_engagement);
-                    println!("  Average Clarity Score: {:.1}/100", avg_clarity);
-                    println!("  Average Productivity Score: {:.1}/100", avg_productivity);
-                    println!("  Average Overall Score: {:.1}/100", avg_overall);
+                    writeln!(report, "  Average Engagement Score: {:.1}/100", avg_engagement)?;
+                    writeln!(report, "  Average Clarity Score: {:.1}/100", avg_clarity)?;
+                    writeln!(report, "  Average Productivity Score: {:.1}/100", avg_productivity)?;
+                    writeln!(report, "  Average Overall Score: {:.1}/100", avg_overall)?;
                 }
             }
         }
@@ -186,7 +311,7 @@ impl SessionAnalyzer {
         Ok(())
     }
 
-    fn generate_recommendations(&self, methodology_stats: &HashMap<Methodology, MethodologyStats>) {
+    fn generate_recommendations(&self, report: &mut String, methodology_stats: &HashMap<Methodology, MethodologyStats>) -> Result<()> {
         let mut recommendations = Vec::new();
 
         // Find the methodology with highest engagement
@@ -237,12 +362,14 @@ impl SessionAnalyzer {
         }
 
         if recommendations.is_empty() {
-            println!("No specific recommendations - continue logging sessions for better insights.");
+            writeln!(report, "No specific recommendations - continue logging sessions for better insights.")?;
         } else {
             for (i, recommendation) in recommendations.iter().enumerate() {
-                println!("{}. {}", i + 1, recommendation);
+                writeln!(report, "{}. {}", i + 1, recommendation)?;
             }
         }
+
+        Ok(())
     }
 
     pub fn get_session_summary(&self, session_id: &str) -> Result<SessionSummary> {
@@ -12,34 +12,29 @@ impl GitRepo {
         let git_dir = path.join(".git");
         
         if !git_dir.exists() {
-            // Initialize new git repository
-            let output = Command::new("git")
-                .args(["init"])
-                .current_dir(path)
-                .output()
-                .context("Failed to run git init")?;
-
-            if !output.status.success() {
-                let stderr = String::from_utf8_lossy(&output.stderr);
-                return Err(anyhow::anyhow!("Git init failed: {}", stderr));
-            }
-
-            // Set up initial commit with .gitkeep
             let gitkeep_path = path.join(".gitkeep");
             std::fs::write(&gitkeep_path, "")
                 .context("Failed to create .gitkeep file")?;
 
-            Command::new("git")
-                .args(["add", ".gitkeep"])
+            // Initialize the repository and create the first commit in one
+            // shell invocation; process spawn cost dominates these short git
+            // commands. The initial commit is best-effort: it fails when no
+            // git identity is configured, which must not stop the logger, so
+            // only git init's own status is propagated.
+            let output = Command::new("sh")
+                .args([
+                    "-c",
+                    "git init && { git add .gitkeep && git commit -m \"$0\" || true; }",
+                    "Initial commit: Initialize claude-logs repository",
+                ])
                 .current_dir(path)
                 .output()
-                .context("Failed to add .gitkeep")?;
+                .context("Failed to initialize git repository")?;
 
-            Command::new("git")
-                .args(["commit", "-m", "Initial commit: Initialize claude-logs repository"])
-                .current_dir(path)
-                .output()
-                .context("Failed to create initial commit")?;
+            if !output.status.success() {
+                let stderr = String::from_utf8_lossy(&output.stderr);
+                return Err(anyhow::anyhow!("Git init failed: {}", stderr));
+            }
         }
 
         Ok(Self {
@@ -54,22 +49,19 @@ impl GitRepo {
             .and_then(|name| name.to_str())
             .context("Invalid log file name")?;
 
-        let add_output = Command::new("git")
-            .args(["add", log_filename])
-            .current_dir(&self.repo_path)
-            .output()
-            .context("Failed to run git add")?;
-
-        if !add_output.status.success() {
-            let stderr = String::from_utf8_lossy(&add_output.stderr);
-            return Err(anyhow::anyhow!("Git add failed: {}", stderr));
-        }
-
         // Create commit message
         let commit_message = self.generate_commit_message(session);
 
-        let commit_output = Command::new("git")
-            .args(["commit", "-m", &commit_message])
+        // Stage, commit, and resolve the new hash with one process spawn.
+        // The path and message are passed as positional shell parameters so
+        // no quoting of user-influenced content is needed.
+        let commit_output = Command::new("sh")
+            .args([
+                "-c",
+                "git add \"$0\" && git commit -m \"$1\" >/dev/null && git rev-parse HEAD",
+                log_filename,
+                &commit_message,
+            ])
             .current_dir(&self.repo_path)
             .output()
             .context("Failed to run git commit")?;
@@ -79,14 +71,7 @@ impl GitRepo {
             return Err(anyhow::anyhow!("Git commit failed: {}", stderr));
         }
 
-        // Get the commit hash
-        let hash_output = Command::new("git")
-            .args(["rev-parse", "HEAD"])
-            .current_dir(&self.repo_path)
-            .output()
-            .context("Failed to get commit hash")?;
-
-        let commit_hash = String::from_utf8_lossy(&hash_output.stdout).trim().to_string();
+        let commit_hash = String::from_utf8_lossy(&commit_output.stdout).trim().to_string();
         Ok(commit_hash)
     }
 
@@ -1,5 +1,7 @@
-use claude_logger::{Cli, ClaudeLogger, Commands, SessionAnalyzer};
+use anyhow::Context;
+use claude_logger::{Cli, ClaudeLogger, Commands, GitRepo, SessionAnalyzer};
 use clap::Parser;
+use std::fmt::Write;
 use std::process;
 
 fn main() {
@@ -49,30 +51,38 @@ fn run_cli(cli: Cli) -> anyhow::Result<()> {
                 return Ok(());
             }
 
-            println!("=== Recent Sessions ===");
+            // Build the listing in one buffer so output hits stdout as a
+            // single write instead of several flushes per session.
+            let mut listing = String::from("=== Recent Sessions ===\n");
             for session in sessions {
-                print!("{} | {} | {} | {}", 
-                    session.id, 
-                    session.methodology, 
+                let _ = write!(listing, "{} | {} | {} | {}",
+                    session.id,
+                    session.methodology,
                     session.project,
                     session.timestamp.format("%Y-%m-%d %H:%M")
                 );
-                
+
                 if let Some(duration) = session.duration {
-                    print!(" | {}m", duration.num_minutes());
+                    let _ = write!(listing, " | {}m", duration.num_minutes());
                 }
-                
+
                 if let Some(energy) = session.creative_energy {
-                    print!(" | Energy: {}/3", energy);
+                    let _ = write!(listing, " | Energy: {}/3", energy);
                 }
-                
-                println!();
+
+                listing.push('\n');
             }
+            print!("{}", listing);
         }
         
         Some(Commands::GitLog { count }) => {
-            let logger = ClaudeLogger::new()?;
-            logger.git_repo().show_log(count)?;
+            // Showing the log only needs the git repo; skip the metadata
+            // parse that a full ClaudeLogger construction would pay for.
+            let logs_dir = ClaudeLogger::default_logs_dir()?;
+            std::fs::create_dir_all(&logs_dir)
+                .with_context(|| format!("Failed to create logs directory: {}", logs_dir.display()))?;
+            let repo = GitRepo::init_or_open(&logs_dir)?;
+            repo.show_log(count)?;
         }
         
         Some(Commands::Show { session_id, full }) => {
@@ -83,7 +93,7 @@ fn run_cli(cli: Cli) -> anyhow::Result<()> {
             
             if full {
                 println!("\n=== Full Log Content ===");
-                let content = std::fs::read_to_string(&summary.session.log_file)?;
+                let content = SessionAnalyzer::read_log_contents(&summary.session.log_file)?;
                 println!("{}", content);
             }
         }
@@ -1,70 +1,105 @@
 use crate::session::AnalysisMetrics;
-use regex::Regex;
+use regex::bytes::Regex;
+use std::io::BufRead;
 use std::sync::OnceLock;
 
 pub struct ConversationPatterns {
-    enthusiasm: Regex,
-    confusion: Regex,
-    compaction: Regex,
-    code_blocks: Regex,
-    exchanges: Regex,
-    questions: Regex,
+    markers: Regex,
+}
+
+/// Accumulator for a single streaming pass over a log.
+#[derive(Default)]
+struct ScanState {
+    metrics: AnalysisMetrics,
+    in_code_block: bool,
 }
 
 impl ConversationPatterns {
     pub fn new() -> Self {
         Self {
-            enthusiasm: Regex::new(r"(?i)(excellent|great|perfect|amazing|awesome|fantastic|wonderful|brilliant|outstanding|superb|terrific|love it|exactly|precisely)").unwrap(),
-            confusion: Regex::new(r"(?i)(confused|unclear|not sure|don't understand|what do you mean|can you clarify|help me understand|i'm lost|not following)").unwrap(),
-            compaction: Regex::new(r"(?i)(concise|brief|short|summarize|compact|terse|reduce|minimize|streamline)").unwrap(),
-            code_blocks: Regex::new(r"```[\s\S]*?```").unwrap(),
-            exchanges: Regex::new(r"^(Human:|Assistant:)").unwrap(),
-            questions: Regex::new(r"\?").unwrap(),
+            // One alternation covering all three marker categories; a single
+            // scan classifies each hit by which named group matched.
+            markers: Regex::new(r"(?i)(?P<enthusiasm>excellent|great|perfect|amazing|awesome|fantastic|wonderful|brilliant|outstanding|superb|terrific|love it|exactly|precisely)|(?P<confusion>confused|unclear|not sure|don't understand|what do you mean|can you clarify|help me understand|i'm lost|not following)|(?P<compaction>concise|brief|short|summarize|compact|terse|reduce|minimize|streamline)").unwrap(),
         }
     }
 
     pub fn analyze_content(&self, content: &str) -> AnalysisMetrics {
-        AnalysisMetrics {
-            exchanges: self.count_exchanges(content),
-            code_blocks: self.count_code_blocks(content),
-            questions_asked: self.count_questions(content),
-            enthusiasm_markers: self.count_matches(&self.enthusiasm, content),
-            confusion_markers: self.count_matches(&self.confusion, content),
-            compaction_indicators: self.count_matches(&self.compaction, content),
+        let mut state = ScanState::default();
+
+        for line in content.lines() {
+            self.scan_line(line.as_bytes(), &mut state);
         }
-    }
 
-    fn count_matches(&self, regex: &Regex, content: &str) -> usize {
-        regex.find_iter(content).count()
+        state.metrics
     }
 
-    fn count_exchanges(&self, content: &str) -> usize {
-        content.lines()
-            .filter(|line| self.exchanges.is_match(line))
-            .count()
-    }
+    /// Analyze a log incrementally, one line at a time, without ever holding
+    /// the full content in memory. This is the path `SessionAnalyzer` uses for
+    /// on-disk logs, which can run to many megabytes. Lines are scanned as raw
+    /// bytes: every pattern the analyzer counts is ASCII, so there is no need
+    /// to pay for UTF-8 validation of terminal capture output (which often
+    /// contains arbitrary escape sequences anyway).
+    pub fn analyze_reader<R: BufRead>(&self, mut reader: R) -> std::io::Result<AnalysisMetrics> {
+        let mut state = ScanState::default();
+        let mut line = Vec::new();
+
+        loop {
+            line.clear();
+            if reader.read_until(b'\n', &mut line)? == 0 {
+                break;
+            }
+            while line.last() == Some(&b'\n') || line.last() == Some(&b'\r') {
+                line.pop();
+            }
+            self.scan_line(&line, &mut state);
+        }
 
-    fn count_code_blocks(&self, content: &str) -> usize {
-        self.code_blocks.find_iter(content).count()
+        Ok(state.metrics)
     }
 
-    fn count_questions(&self, content: &str) -> usize {
-        // Count question marks but exclude those in code blocks
-        let mut question_count = 0;
-        let mut in_code_block = false;
-        
-        for line in content.lines() {
-            if line.trim_start().starts_with("```") {
-                in_code_block = !in_code_block;
-                continue;
+    fn scan_line(&self, line: &[u8], state: &mut ScanState) {
+        // Fences may appear mid-line, so walk the segments between them:
+        // toggle the code-block state at each fence (a closing fence
+        // completes one code block) and count question marks only in the
+        // segments that fall outside code blocks.
+        let mut rest = line;
+        loop {
+            let fence = find_subslice(rest, b"```");
+            let segment = match fence {
+                Some(pos) => &rest[..pos],
+                None => rest,
+            };
+            if !state.in_code_block {
+                state.metrics.questions_asked +=
+                    segment.iter().filter(|&&b| b == b'?').count();
             }
-            
-            if !in_code_block {
-                question_count += line.matches('?').count();
+            match fence {
+                Some(pos) => {
+                    if state.in_code_block {
+                        state.metrics.code_blocks += 1;
+                    }
+                    state.in_code_block = !state.in_code_block;
+                    rest = &rest[pos + 3..];
+                }
+                None => break,
+            }
+        }
+
+        // Speaker prefixes are fixed literals anchored at line start, so a
+        // plain prefix compare beats running the regex engine per line.
+        if line.starts_with(b"Human:") || line.starts_with(b"Assistant:") {
+            state.metrics.exchanges += 1;
+        }
+
+        for caps in self.markers.captures_iter(line) {
+            if caps.name("enthusiasm").is_some() {
+                state.metrics.enthusiasm_markers += 1;
+            } else if caps.name("confusion").is_some() {
+                state.metrics.confusion_markers += 1;
+            } else {
+                state.metrics.compaction_indicators += 1;
             }
         }
-        
-        question_count
     }
 }
 
@@ -74,6 +109,16 @@ impl Default for ConversationPatterns {
     }
 }
 
+/// Find the first occurrence of `needle`; callers resume searching after the
+/// full match, so fence scans stay non-overlapping (a run of four backticks
+/// is one fence, not two).
+fn find_subslice(haystack: &[u8], needle: &[u8]) -> Option<usize> {
+    if haystack.len() < needle.len() {
+        return None;
+    }
+    haystack.windows(needle.len()).position(|w| w == needle)
+}
+
 // Global instance using OnceLock for thread-safe lazy initialization
 static PATTERNS: OnceLock<ConversationPatterns> = OnceLock::new();
 
@@ -148,7 +193,7 @@ mod tests {
 
     #[test]
     fn test_pattern_matching() {
-        let patterns = ConversationPatterns::new();
+        let patterns = get_patterns();
         let content = r#"
 Human: This is great! Can you help me with ```rust
 fn main() {
@@ -159,9 +204,24 @@ Assistant: Sure\! This code creates a simple Hello World program.
 "#;
 
         let metrics = patterns.analyze_content(content);
-        
+
         assert_eq!(metrics.exchanges, 2);
         assert_eq!(metrics.code_blocks, 1);
         assert!(metrics.enthusiasm_markers > 0);
     }
+
+    #[test]
+    fn test_mid_line_fences() {
+        let patterns = get_patterns();
+        let content = "What does this do? ```let x = y?;``` and this?\n````\nis this code?\n````\n";
+
+        let metrics = patterns.analyze_content(content);
+
+        // Questions outside code blocks count; the `?` inside the inline
+        // fence and the one inside the four-backtick block do not.
+        assert_eq!(metrics.questions_asked, 2);
+        // One inline block plus one fenced block; the four-backtick fences
+        // must not double-count.
+        assert_eq!(metrics.code_blocks, 2);
+    }
 }
@@ -1,7 +1,12 @@
+use anyhow::{Context, Result};
 use chrono::{DateTime, Duration, Utc};
 use serde::{Deserialize, Serialize};
 use std::collections::HashMap;
-use std::path::PathBuf;
+use std::fs;
+use std::io::{self, BufRead};
+use std::path::{Path, PathBuf};
+use std::sync::{Mutex, OnceLock};
+use std::time::SystemTime;
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct SessionMetadata {
@@ -63,9 +68,12 @@ pub struct MethodologyStats {
     pub sessions: usize,
     pub total_duration: Duration,
     pub avg_duration: Duration,
-    pub creative_energy: Vec<u8>,
     pub avg_energy: Option<f64>,
     pub metrics: AnalysisMetrics,
+    // Running accumulators so averages update in O(1) per session instead
+    // of retaining and re-summing every sample.
+    energy_sum: f64,
+    energy_samples: usize,
 }
 
 impl MethodologyStats {
@@ -74,25 +82,25 @@ impl MethodologyStats {
             sessions: 0,
             total_duration: Duration::zero(),
             avg_duration: Duration::zero(),
-            creative_energy: Vec::new(),
             avg_energy: None,
             metrics: AnalysisMetrics::default(),
+            energy_sum: 0.0,
+            energy_samples: 0,
         }
     }
 
     pub fn add_session(&mut self, session: &SessionMetadata, metrics: AnalysisMetrics) {
         self.sessions += 1;
-        
+
         if let Some(duration) = session.duration {
             self.total_duration = self.total_duration + duration;
             self.avg_duration = self.total_duration / self.sessions as i32;
         }
 
         if let Some(energy) = session.creative_energy {
-            self.creative_energy.push(energy);
-            let avg = self.creative_energy.iter().map(|&x| x as f64).sum::<f64>() 
-                / self.creative_energy.len() as f64;
-            self.avg_energy = Some(avg);
+            self.energy_sum += energy as f64;
+            self.energy_samples += 1;
+            self.avg_energy = Some(self.energy_sum / self.energy_samples as f64);
         }
 
         // Aggregate metrics
@@ -111,12 +119,109 @@ pub struct SessionsMetadata {
 }
 
 impl SessionsMetadata {
+    /// Append-only session store: one JSON object per line, so recording a
+    /// session writes a single new line instead of rewriting the history.
+    pub const SESSIONS_FILE: &'static str = "sessions.ndjson";
+
+    /// Monolithic store written by earlier versions; still read at load time
+    /// so existing histories keep working.
+    pub const LEGACY_METADATA_FILE: &'static str = "sessions_metadata.json";
+
     pub fn new() -> Self {
         Self {
             sessions: HashMap::new(),
         }
     }
 
+    /// Load all recorded sessions from a logs directory. Entries from the
+    /// append log take precedence over the legacy monolithic file; later
+    /// lines for the same session id override earlier ones.
+    ///
+    /// Results are cached per directory for the life of the process, keyed on
+    /// the (mtime, size) of both store files, so constructing several loggers
+    /// or analyzers only parses the history once.
+    pub fn load_from_dir(logs_dir: &Path) -> Result<Self> {
+        let legacy_stamp = file_stamp(&logs_dir.join(Self::LEGACY_METADATA_FILE));
+        let sessions_stamp = file_stamp(&logs_dir.join(Self::SESSIONS_FILE));
+
+        let cache = metadata_cache();
+        if let Some(cached) = cache.lock().unwrap().get(logs_dir) {
+            if cached.legacy_stamp == legacy_stamp && cached.sessions_stamp == sessions_stamp {
+                return Ok(cached.metadata.clone());
+            }
+        }
+
+        let metadata = Self::load_from_dir_uncached(logs_dir)?;
+
+        cache.lock().unwrap().insert(
+            logs_dir.to_path_buf(),
+            CachedStore {
+                legacy_stamp,
+                sessions_stamp,
+                metadata: metadata.clone(),
+            },
+        );
+
+        Ok(metadata)
+    }
+
+    fn load_from_dir_uncached(logs_dir: &Path) -> Result<Self> {
+        let mut metadata = Self::new();
+
+        let legacy_file = logs_dir.join(Self::LEGACY_METADATA_FILE);
+        match fs::read_to_string(&legacy_file) {
+            Ok(content) => {
+                let legacy: SessionsMetadata = serde_json::from_str(&content)
+                    .with_context(|| format!("Failed to parse metadata file: {}", legacy_file.display()))?;
+                metadata.sessions.extend(legacy.sessions);
+            }
+            Err(e) if e.kind() == io::ErrorKind::NotFound => {}
+            Err(e) => return Err(e)
+                .with_context(|| format!("Failed to read metadata file: {}", legacy_file.display())),
+        }
+
+        // Stream the append log through a buffered reader so loading stays at
+        // one allocation per line rather than one copy of the whole file.
+        //
+        // A malformed final line is tolerated: a crash or full disk mid-append
+        // can tear the last entry, and refusing to load would brick every
+        // command until the file is hand-edited. Only that entry is dropped
+        // (with a warning); the next successful append overwrites the torn
+        // tail. Corruption anywhere earlier is still an error.
+        let sessions_file = logs_dir.join(Self::SESSIONS_FILE);
+        match fs::File::open(&sessions_file) {
+            Ok(file) => {
+                let mut pending_error: Option<anyhow::Error> = None;
+                for line in io::BufReader::new(file).split(b'\n') {
+                    let line = line
+                        .with_context(|| format!("Failed to read sessions file: {}", sessions_file.display()))?;
+                    if let Some(error) = pending_error.take() {
+                        return Err(error);
+                    }
+                    if line.is_empty() {
+                        continue;
+                    }
+                    match serde_json::from_slice::<SessionMetadata>(&line) {
+                        Ok(session) => metadata.add_session(session),
+                        Err(e) => pending_error = Some(anyhow::Error::new(e)
+                            .context(format!("Failed to parse session entry in: {}", sessions_file.display()))),
+                    }
+                }
+                if pending_error.is_some() {
+                    eprintln!(
+                        "Warning: Skipping truncated final entry in: {}",
+                        sessions_file.display()
+                    );
+                }
+            }
+            Err(e) if e.kind() == io::ErrorKind::NotFound => {}
+            Err(e) => return Err(e)
+                .with_context(|| format!("Failed to read sessions file: {}", sessions_file.display())),
+        }
+
+        Ok(metadata)
+    }
+
     pub fn add_session(&mut self, session: SessionMetadata) {
         self.sessions.insert(session.id.clone(), session);
     }
@@ -146,4 +251,75 @@ impl Default for SessionsMetadata {
     fn default() -> Self {
         Self::new()
     }
+}
+
+struct CachedStore {
+    legacy_stamp: Option<(SystemTime, u64)>,
+    sessions_stamp: Option<(SystemTime, u64)>,
+    metadata: SessionsMetadata,
+}
+
+static METADATA_CACHE: OnceLock<Mutex<HashMap<PathBuf, CachedStore>>> = OnceLock::new();
+
+fn metadata_cache() -> &'static Mutex<HashMap<PathBuf, CachedStore>> {
+    METADATA_CACHE.get_or_init(|| Mutex::new(HashMap::new()))
+}
+
+fn file_stamp(path: &Path) -> Option<(SystemTime, u64)> {
+    let stat = fs::metadata(path).ok()?;
+    let modified = stat.modified().ok()?;
+    Some((modified, stat.len()))
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn sample_session(id: &str) -> SessionMetadata {
+        SessionMetadata {
+            id: id.to_string(),
+            timestamp: Utc::now(),
+            project: "test-project".to_string(),
+            methodology: Methodology::Unknown,
+            working_directory: PathBuf::from("/tmp"),
+            command: "claude".to_string(),
+            log_file: PathBuf::from(format!("{}.log", id)),
+            duration: None,
+            end_time: None,
+            features_worked_on: Vec::new(),
+            creative_energy: None,
+        }
+    }
+
+    fn write_store(dir: &Path, contents: &[u8]) {
+        fs::write(dir.join(SessionsMetadata::SESSIONS_FILE), contents).unwrap();
+    }
+
+    #[test]
+    fn test_load_skips_truncated_final_line() {
+        let dir = tempfile::tempdir().unwrap();
+
+        // A complete entry followed by a torn append (no closing brace or
+        // newline), as left behind by a crash mid-write.
+        let mut contents = serde_json::to_vec(&sample_session("complete")).unwrap();
+        contents.push(b'\n');
+        contents.extend_from_slice(b"{\"id\":\"torn\",\"time");
+        write_store(dir.path(), &contents);
+
+        let metadata = SessionsMetadata::load_from_dir_uncached(dir.path()).unwrap();
+        assert_eq!(metadata.sessions.len(), 1);
+        assert!(metadata.get_session("complete").is_some());
+    }
+
+    #[test]
+    fn test_load_errors_on_corrupt_middle_line() {
+        let dir = tempfile::tempdir().unwrap();
+
+        let mut contents = b"{\"id\":\"corrupt\",\"time\n".to_vec();
+        contents.extend_from_slice(&serde_json::to_vec(&sample_session("later")).unwrap());
+        contents.push(b'\n');
+        write_store(dir.path(), &contents);
+
+        assert!(SessionsMetadata::load_from_dir_uncached(dir.path()).is_err());
+    }
 }
\ No newline at end of file